@@ -1,6 +1,8 @@
 """Constructs the BigQuery client and performs operations for the primary script.
 """
 import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo
 
 import config
 from google.cloud import bigquery
@@ -10,24 +12,53 @@ PROJECT_ID = config.PROJECT_ID
 DATASET_ID = config.DATASET_ID
 TABLE_ID = config.TABLE_ID
 FULL_TABLE_ID = f"{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}"
+SYDNEY_TZ = ZoneInfo("Australia/Sydney")
+
+_SCHEMA = [
+    bigquery.SchemaField("alert_id", "STRING"),
+    bigquery.SchemaField("url", "STRING"),
+    bigquery.SchemaField("title", "STRING"),
+    bigquery.SchemaField("description_html", "STRING"),
+    bigquery.SchemaField("start_date", "STRING"),
+    bigquery.SchemaField("end_date", "STRING"),
+    bigquery.SchemaField("l1_line_impacted", "BOOLEAN"),
+    bigquery.SchemaField("creation_date", "DATETIME"),  # Sydney local time
+]
+
+_EXISTING_IDS_QUERY = f"""
+    SELECT alert_id
+    FROM `{DATASET_ID}.{TABLE_ID}`
+    WHERE alert_id IN UNNEST(@ids)
+"""
 
 # Set the logging level to INFO so that INFO messages get logged.
 # pylint: disable=W1203
 logging.basicConfig(level=logging.INFO)
 
+# Cached across warm Cloud Function invocations, which reuse the Python process.
+_client = None
+_table_checked = False
+
 
 def create_bq_client():
     """Creates a BigQuery client for the specified project.
 
+    The client is created once per process and reused on subsequent calls.
+
     Returns:
         google.cloud.bigquery.client.Client: A BigQuery client instance.
     """
-    return bigquery.Client(project=PROJECT_ID)
+    global _client
+    if _client is None:
+        _client = bigquery.Client(project=PROJECT_ID)
+    return _client
 
 
 def check_table_exists(client):
     """Checks if the specified table exists in BigQuery.
 
+    Once the table is known to exist, later calls return True without an API request.
+
     Args:
         client (google.cloud.bigquery.client.Client): A BigQuery client.
 
@@ -37,10 +68,15 @@ def check_table_exists(client):
     Raises:
         GoogleCloudError: If an error occurs during the API request.
     """
+    global _table_checked
+    if _table_checked:
+        return True
+
     try:
         # Make an API request to check if the table exists.
         client.get_table(FULL_TABLE_ID)  # Make an API request.
         logging.info(f"Table {FULL_TABLE_ID} exists.\n")
+        _table_checked = True
         return True
     except NotFound as e:
         # If the table does not exist, NotFound exception is raised.
@@ -60,21 +96,12 @@ def create_new_table(client):
     Raises:
         GoogleCloudError: If an error occurs while creating the table.
     """
-    schema = [
-        bigquery.SchemaField("alert_id", "STRING"),
-        bigquery.SchemaField("url", "STRING"),
-        bigquery.SchemaField("title", "STRING"),
-        bigquery.SchemaField("description_html", "STRING"),
-        bigquery.SchemaField("start_date", "STRING"),
-        bigquery.SchemaField("end_date", "STRING"),
-        bigquery.SchemaField("l1_line_impacted", "BOOLEAN"),
-        bigquery.SchemaField("creation_date", "DATETIME"),  # CURRENT_DATETIME
-    ]
-
+    global _table_checked
     try:
         # Create a Table object
-        table = bigquery.Table(FULL_TABLE_ID, schema=schema)
+        table = bigquery.Table(FULL_TABLE_ID, schema=_SCHEMA)
         table = client.create_table(table)
+        _table_checked = True
         logging.info(
             f"Table {TABLE_ID} created in dataset {DATASET_ID} in project {PROJECT_ID}."
         )
@@ -83,85 +110,79 @@ def create_new_table(client):
         raise e
 
 
-def check_alert_id_is_unique(client, processed_alert):
-    """Checks if the alert ID is unique in the table.
+def get_existing_alert_ids(client, ids):
+    """Finds which of the given alert IDs already exist in the table.
 
     Args:
         client (google.cloud.bigquery.client.Client): A BigQuery client.
-        processed_alert (dict): The processed alert data containing the alert ID.
+        ids (list[str]): The alert IDs to look up.
 
     Returns:
-        bool: True if the alert ID is unique, False otherwise.
-    """
-    alert_id = processed_alert["alert_id"]
-    check_query = f"""
-        SELECT COUNT(*)
-        FROM `{DATASET_ID}.{TABLE_ID}`
-        WHERE alert_id = @alert_id
+        set[str]: The subset of `ids` that already exist in the table.
     """
+    if not ids:
+        return set()
+
     job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("alert_id", "STRING", alert_id),
-            bigquery.ScalarQueryParameter("dataset", "STRING", DATASET_ID),
-            bigquery.ScalarQueryParameter("table", "STRING", TABLE_ID),
-        ]
+        query_parameters=[bigquery.ArrayQueryParameter("ids", "STRING", ids)]
     )
-    query_job = client.query(check_query, job_config=job_config)
-    results = query_job.result()
+    # Uses the jobs.query endpoint, saving the extra polling request of query().result()
+    results = client.query_and_wait(_EXISTING_IDS_QUERY, job_config=job_config)
 
-    # Check if the ID was found
-    id_exists = False
-    if next(results)[0] > 0:
-        id_exists = True
+    existing_ids = {row["alert_id"] for row in results}
+    for alert_id in existing_ids:
         logging.info(f"id: {alert_id} already exists in table, skipping.")
 
-    return id_exists
+    return existing_ids
+
 
+def insert_values_bulk(client, alerts):
+    """Streams the processed alerts into the table in a single API request.
 
-def insert_values_into_table(client, processed_alert):
-    """Inserts values into the table based on the processed alert data.
+    Each row uses its alert ID as the insert ID, so BigQuery drops rows that are
+    retried or resent within its streaming deduplication window. That window is short
+    and best-effort, so callers should still filter out alerts returned by
+    `get_existing_alert_ids` first. The batch is all-or-nothing: if any row is
+    invalid, none are written.
 
     Args:
         client (google.cloud.bigquery.client.Client): A BigQuery client.
-        processed_alert (dict): The processed alert data to be inserted.
+        alerts (list[dict]): The processed alert data to be inserted.
 
     Raises:
         GoogleCloudError: If an error occurs while inserting rows into the table.
     """
-    query = f"""
-        INSERT INTO `{DATASET_ID}.{TABLE_ID}` (alert_id, url, title, description_html, start_date, end_date, l1_line_impacted, creation_date)
-        VALUES (@alert_id, @url, @title, @description_html, @start_date, @end_date, @l1_line_impacted, CURRENT_DATETIME('Australia/Sydney'))
-    """
-    logging.info("Attempting to add new row into the BQ table.")
-    logging.info(query)
-    # Using named parameters for clarity and security
-    query_params = [
-        bigquery.ScalarQueryParameter(
-            "alert_id", "STRING", processed_alert["alert_id"]
-        ),
-        bigquery.ScalarQueryParameter("url", "STRING", processed_alert["url"]),
-        bigquery.ScalarQueryParameter("title", "STRING", processed_alert["title"]),
-        bigquery.ScalarQueryParameter(
-            "description_html", "STRING", processed_alert["description_html"]
-        ),
-        bigquery.ScalarQueryParameter(
-            "start_date", "STRING", processed_alert["formatted_start_date"]
-        ),
-        bigquery.ScalarQueryParameter(
-            "end_date", "STRING", processed_alert["formatted_end_date"]
-        ),
-        bigquery.ScalarQueryParameter(
-            "l1_line_impacted", "BOOL", processed_alert["l1_line_impacted"]
-        ),
+    if not alerts:
+        return
+
+    logging.info(f"Attempting to add {len(alerts)} rows into the BQ table.")
+    # BigQuery's canonical DATETIME format, accepted by both streaming and load jobs
+    creation_date = datetime.now(SYDNEY_TZ).replace(tzinfo=None).isoformat(sep=" ")
+    rows = [
+        {
+            "alert_id": alert["alert_id"],
+            "url": alert["url"],
+            "title": alert["title"],
+            "description_html": alert["description_html"],
+            "start_date": alert["formatted_start_date"],
+            "end_date": alert["formatted_end_date"],
+            "l1_line_impacted": alert["l1_line_impacted"],
+            "creation_date": creation_date,
+        }
+        for alert in alerts
     ]
 
-    job_config = bigquery.QueryJobConfig(query_parameters=query_params)
-
     try:
-        # Execute the query with parameters
-        query_job = client.query(query, job_config=job_config)  # Make an API request.
-        query_job.result()  # Wait for the query to finish
-        logging.info("New row has been added!")
+        errors = client.insert_rows_json(  # Make an API request.
+            FULL_TABLE_ID,
+            rows,
+            row_ids=[alert["alert_id"] for alert in alerts],
+            skip_invalid_rows=False,
+            ignore_unknown_values=False,
+        )
+        if errors:
+            raise GoogleCloudError(f"Rows were rejected: {errors}")
+        logging.info(f"{len(alerts)} new rows have been added!")
     except GoogleCloudError as e:
         # Handle exceptions raised by the client library
         logging.error(f"Encountered an error while inserting rows: {e}")
@@ -11,13 +11,16 @@ every 1 minute.
 import logging
 import os
 import smtplib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from email.message import EmailMessage
 
 import bigquery_interface
 import config
+import orjson
 import requests
+from google.cloud.exceptions import GoogleCloudError
 
 # Set the logging level to INFO so that INFO messages get logged.
 # pylint: disable=W1203
@@ -26,6 +29,9 @@ logging.basicConfig(level=logging.INFO)
 # API Constants
 API_URL = "https://api.transport.nsw.gov.au/v2/gtfs/alerts/lightrail?format=json"
 TNSW_API_KEY = config.TNSW_API_KEY if config.TNSW_API_KEY else os.getenv("TNSW_API_KEY")
+L1_ROUTE_ID = "IWLR-191"
+# Reused across warm invocations so the HTTPS connection to the API is kept alive
+_SESSION = requests.Session()
 
 # Email Configuration
 SMTP_SERVER = "smtp.office365.com"
@@ -34,6 +40,13 @@ EMAIL_FROM = config.EMAIL_FROM
 EMAIL_TO = config.EMAIL_TO
 EMAIL_FROM_KEY = config.EMAIL_FROM_KEY
 
+# Worker threads for overlapping independent network requests within an invocation
+_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+# Alert IDs already stored in BigQuery, remembered across warm invocations (LRU)
+SEEN_IDS_MAX_SIZE = 256
+_SEEN_IDS = OrderedDict()
+
 
 def fetch_data():
     """Retrieves alert status data from the TNSW API for the Sydney Lightrail lines.
@@ -57,14 +70,54 @@ def fetch_data():
     headers = {"Authorization": f"apikey {TNSW_API_KEY}"}
 
     try:
-        response = requests.get(API_URL, headers=headers, timeout=20)
+        response = _SESSION.get(API_URL, headers=headers, timeout=20)
         response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
+        logging.debug("Response payload size=%d", len(response.content))
+        return orjson.loads(response.content)
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         logging.error(f"An error occurred while fetching data: {e}")
         return None
 
 
+def _seen_add(alert_id):
+    """Records an alert ID as already stored, evicting the least recently seen ID.
+
+    Args:
+        alert_id (str): The alert ID to remember.
+    """
+    _SEEN_IDS[alert_id] = None
+    _SEEN_IDS.move_to_end(alert_id)
+    if len(_SEEN_IDS) > SEEN_IDS_MAX_SIZE:
+        _SEEN_IDS.popitem(last=False)
+
+
+def _prepare_bq_table():
+    """Creates the BigQuery client and ensures the alerts table exists.
+
+    Returns:
+        google.cloud.bigquery.client.Client: A BigQuery client instance.
+    """
+    client = bigquery_interface.create_bq_client()
+    if not bigquery_interface.check_table_exists(client):
+        bigquery_interface.create_new_table(client)
+    return client
+
+
+def _affects_l1(entity):
+    """Checks whether an alert entity impacts the L1 line (IWLR-191).
+
+    Args:
+        entity (dict): A dictionary containing alert details.
+
+    Returns:
+        bool: True if any of the informed entities is the L1 route, False otherwise.
+    """
+    return any(
+        line.get("routeId") == L1_ROUTE_ID
+        for line in entity.get("alert", {}).get("informedEntity", [])
+    )
+
+
 def process_response_alert(entity):
     """Process an alert entity and extract relevant information.
 
@@ -112,13 +165,7 @@ def process_response_alert(entity):
             formatted_end_date = "NULL"
 
         # impacted lines
-        affected_lines_json = entity["alert"]["informedEntity"]
-        l1_line_impacted = False
-        for line in affected_lines_json:
-            if line["routeId"] == "IWLR-191" and line["directionId"] == 1:
-                l1_line_impacted = True
-            elif line["routeId"] == "IWLR-191" and line["directionId"] == 0:
-                l1_line_impacted = True
+        l1_line_impacted = _affects_l1(entity)
 
         processed_alert = {
             "alert_id": alert_id,
@@ -150,11 +197,9 @@ def format_email_body(processed_response_alert):
         str: A formatted email body string. Each line in the string contains an alert 
         type followed by its details, separated by a colon and a space.
     """
-    email_body_str = ""
-    for alert in processed_response_alert:
-        email_body_str += f"{alert}: {processed_response_alert[alert]}\n"
-
-    return email_body_str
+    return "".join(
+        f"{alert}: {details}\n" for alert, details in processed_response_alert.items()
+    )
 
 
 def send_email(formatted_email_body):
@@ -165,7 +210,8 @@ def send_email(formatted_email_body):
     email through a predefined SMTP server. If sending fails, it logs the error.
 
     Args:
-        formatted_email_body (str): The body of the email to be sent.
+        formatted_email_body (list[str]): The bodies to send, joined with a "==="
+            separator line into a single email.
 
     Returns:
         True or None
@@ -177,11 +223,11 @@ def send_email(formatted_email_body):
         with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
             server.starttls()
             server.login(EMAIL_FROM, EMAIL_FROM_KEY)
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg["From"] = EMAIL_FROM
             msg["To"] = EMAIL_TO
             msg["Subject"] = "Lightrail status alert"
-            msg.attach(MIMEText("===\n".join(formatted_email_body), "plain"))
+            msg.set_content("===\n".join(formatted_email_body))
             server.send_message(msg)
             logging.info("Email sent successfully!")
             return True
@@ -205,44 +251,60 @@ def main(gcp_arg):
             message and a 500 status code indicating an internal server error.
     """
     logging.info(gcp_arg)
-    response_json = fetch_data()
+    # The API request and the BigQuery setup are independent, so run them concurrently
+    response_future = _EXECUTOR.submit(fetch_data)
+    client_future = _EXECUTOR.submit(_prepare_bq_table)
+    response_json = response_future.result()
+    client = client_future.result()
+
     if response_json is None:
         logging.error("No response received from the API.")
         return ("Error: The API response is invalid", 500)
-    logging.info(f"Response: {response_json}\n=====")
 
     number_of_results = len(response_json["entity"])
     logging.info(f"found {number_of_results}")
 
-    client = bigquery_interface.create_bq_client()
-    if not bigquery_interface.check_table_exists(client):
-        bigquery_interface.create_new_table(client)
-
-    alerts_to_email = []
+    l1_alerts = []
     for idx, entity in enumerate(response_json["entity"]):
-        processed_response_alert = process_response_alert(entity)
-        if processed_response_alert is None:
-            return (f"Error: Unable to process result {entity}", 500)
         logging.info(f"result: {idx+1}. remaining: {number_of_results - idx}")
-        logging.info(f"\n{processed_response_alert}\n")
-
-        if processed_response_alert[
-            "l1_line_impacted"
-        ] == True and not bigquery_interface.check_alert_id_is_unique(
-            client, processed_response_alert
-        ):
-            logging.info("New alert found.")
-            bigquery_interface.insert_values_into_table(client, processed_response_alert)
-            alerts_to_email.append(processed_response_alert)
-        else:
+        # Most alerts are for other lines, so skip them before any processing
+        if not _affects_l1(entity):
             logging.info("Skipping alert.")
+            continue
+        if entity.get("id") in _SEEN_IDS:
+            _seen_add(entity["id"])
+            logging.info(f"id: {entity['id']} was already processed, skipping.")
+            continue
 
-    logging.info(f"Alerts:\n{alerts_to_email}")
+        processed_response_alert = process_response_alert(entity)
+        if processed_response_alert is None:
+            return (f"Error: Unable to process result {entity}", 500)
+        logging.debug("\n%s\n", processed_response_alert)
+        l1_alerts.append(processed_response_alert)
+
+    existing_alert_ids = bigquery_interface.get_existing_alert_ids(
+        client, [alert["alert_id"] for alert in l1_alerts]
+    )
+    for alert_id in existing_alert_ids:
+        _seen_add(alert_id)
+    alerts_to_email = [
+        alert for alert in l1_alerts if alert["alert_id"] not in existing_alert_ids
+    ]
+    logging.debug("Alerts:\n%s", alerts_to_email)
     if len(alerts_to_email) > 0:
+        logging.info(f"{len(alerts_to_email)} new alerts found.")
         email_body_content = []
         for alert in alerts_to_email:
             email_body_content.append(format_email_body(alert))
 
+        # Only email once the alerts are saved, otherwise every run would resend them
+        try:
+            bigquery_interface.insert_values_bulk(client, alerts_to_email)
+        except GoogleCloudError:
+            return ("Error: Unable to save new alerts.", 500)
+        for alert in alerts_to_email:
+            _seen_add(alert["alert_id"])
+
         logging.info("Sending email")
         send_email_result = send_email(email_body_content)
         if send_email_result is None:
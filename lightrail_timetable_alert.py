@@ -6,18 +6,19 @@ daily prior to the depature time to check against.
 import logging
 import os
 import smtplib
-from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from zoneinfo import ZoneInfo
 
 import config
-import pytz
+import orjson
 import requests
 
 # Settings (anonymised)
 TARGET_DEPARTURE_HOUR = 7
 TARGET_DEPARTURE_MINUTES = 50
 STATION_ID = 220322
+SYDNEY_TZ = ZoneInfo("Australia/Sydney")
 
 # Set the logging level to INFO so that INFO messages get logged.
 # pylint: disable=W1203
@@ -26,6 +27,8 @@ logging.basicConfig(level=logging.INFO)
 # API Constants
 API_URL = "https://api.transport.nsw.gov.au/v1/tp/departure_mon?outputFormat=rapidJSON&departureMonitorMacro=true&TfNSWDM=true"
 TNSW_API_KEY = config.TNSW_API_KEY if config.TNSW_API_KEY else os.getenv("TNSW_API_KEY")
+# Reused across warm invocations so the HTTPS connection to the API is kept alive
+_SESSION = requests.Session()
 # Email Configuration
 EMAIL_BODY = f"No {TARGET_DEPARTURE_HOUR}:{TARGET_DEPARTURE_MINUTES} depature found: https://transportnsw.info/trip#/departures?accessible=false&depart=220322&routes=780l1&type=stop"
 SMTP_SERVER = "smtp.office365.com"
@@ -66,10 +69,11 @@ def fetch_data():
         "exclMOT_11": "1",
     }
     try:
-        response = requests.get(API_URL, headers=headers, params=params, timeout=15)
+        response = _SESSION.get(API_URL, headers=headers, params=params, timeout=15)
         response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
+        logging.debug("Response payload size=%d", len(response.content))
+        return orjson.loads(response.content)
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         logging.error(f"An error occurred while fetching data: {e}")
         return None
 
@@ -82,17 +86,16 @@ def format_target_time():
     savings automatically.
 
     Returns:
-        str: The target time formatted as "HH:MM" in UTC.
+        str: The target date and time formatted as "YYYY-MM-DDTHH:MM" in UTC, matching
+            the start of the API's `departureTimePlanned` values.
     """
-    sydney_tz = pytz.timezone("Australia/Sydney")
     # Specify 7:40 AM for today's date in Sydney - this is the depature time to verify
-    specified_sydney_datetime = datetime.now().replace(
+    localized_sydney_datetime = datetime.now(SYDNEY_TZ).replace(
         hour=TARGET_DEPARTURE_HOUR, minute=TARGET_DEPARTURE_MINUTES
     )
-    localized_sydney_datetime = sydney_tz.localize(specified_sydney_datetime)
     # Convert the specified Sydney time to UTC
-    utc_time = localized_sydney_datetime.astimezone(pytz.utc)
-    return utc_time.strftime("%H:%M")  # 07:40 Syd is 20:40 UTC
+    utc_time = localized_sydney_datetime.astimezone(timezone.utc)
+    return utc_time.strftime("%Y-%m-%dT%H:%M")  # 07:50 Syd on the 16th is 2026-10-15T20:50 UTC
 
 
 def send_email(formatted_email_body):
@@ -103,7 +106,8 @@ def send_email(formatted_email_body):
     a predefined SMTP server. If sending fails, it logs the error.
 
     Args:
-        formatted_email_body (str): The body of the email to be sent.
+        formatted_email_body (list[str]): The bodies to send, joined with a "==="
+            separator line into a single email.
 
     Returns:
         True or None
@@ -115,11 +119,11 @@ def send_email(formatted_email_body):
         with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
             server.starttls()
             server.login(EMAIL_FROM, EMAIL_FROM_KEY)
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg["From"] = EMAIL_FROM
             msg["To"] = EMAIL_TO
             msg["Subject"] = "Lightrail timetable alert"
-            msg.attach(MIMEText(formatted_email_body, "plain"))
+            msg.set_content("===\n".join(formatted_email_body))
             server.send_message(msg)
             logging.info("Email sent successfully!")
             return True
@@ -156,7 +160,6 @@ def main(gcp_arg):
     if response_json is None:
         logging.error("No response received from the API.")
         return ("Error: The API response is invalid", 500)
-    logging.info(response_json)
     target_time = format_target_time()
     logging.info(
         f"\nSydney Time: {TARGET_DEPARTURE_HOUR}:{TARGET_DEPARTURE_MINUTES}. UTC Target time: {target_time}."
@@ -165,14 +168,14 @@ def main(gcp_arg):
     found_target_time = False
     for idx, x in enumerate(response_json["stopEvents"]):
         logging.info(f"count: {idx}. {x['departureTimePlanned']}")
-        if target_time in x["departureTimePlanned"]:
+        if x["departureTimePlanned"].startswith(target_time):
             found_target_time = True
             logging.info("found target time in planned departures - no email to send")
             break
 
     if not found_target_time:
         logging.info("no matching depature time was found! sending email to alert")
-        send_email_result = send_email(EMAIL_BODY)
+        send_email_result = send_email([EMAIL_BODY])
         if send_email_result is None:
             return ("Error: Unable to send email.", 500)
 